@@ -1,7 +1,13 @@
 from django.contrib import admin
-from .models import Country
+from .models import Country, ExchangeRateSnapshot
 
 @admin.register(Country)
 class CountryAdmin(admin.ModelAdmin):
     list_display = ('name','region','currency_code','population','estimated_gdp','last_refreshed_at')
     search_fields = ('name','currency_code')
+
+
+@admin.register(ExchangeRateSnapshot)
+class ExchangeRateSnapshotAdmin(admin.ModelAdmin):
+    list_display = ('fetched_at',)
+    date_hierarchy = 'fetched_at'
@@ -0,0 +1,20 @@
+# countries/management/commands/compact_rate_history.py
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from countries import services
+
+class Command(BaseCommand):
+    help = 'Apply retention and compaction to the exchange-rate history'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--retention-days', type=int, default=settings.RATE_HISTORY_RETENTION_DAYS,
+                            help='Drop snapshots older than this many days (0 = keep forever)')
+        parser.add_argument('--compact-after-days', type=int, default=settings.RATE_HISTORY_COMPACT_AFTER_DAYS,
+                            help='Keep only the last snapshot per day once older than this many days')
+
+    def handle(self, *args, **options):
+        expired, compacted = services.compact_rate_history(
+            retention_days=options['retention_days'],
+            compact_after_days=options['compact_after_days'],
+        )
+        self.stdout.write(f"Removed {expired} expired and {compacted} compacted snapshots")
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.7 on 2026-10-19 17:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('countries', '0002_country_countries_name_19480f_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExchangeRateSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fetched_at', models.DateTimeField(db_index=True)),
+                ('rates', models.JSONField(default=dict)),
+            ],
+            options={
+                'db_table': 'exchange_rate_snapshots',
+                'ordering': ['fetched_at'],
+            },
+        ),
+    ]
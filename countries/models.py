@@ -20,4 +20,20 @@ class Country(models.Model):
         ]
     
     def __str__(self):
-        return self.name
\ No newline at end of file
+        return self.name
+
+class ExchangeRateSnapshot(models.Model):
+    """
+    One row per exchange-rate refresh. `rates` holds the full
+    currency code -> rate mapping so a single currency can be pulled
+    out by the database without loading the whole history.
+    """
+    fetched_at = models.DateTimeField(db_index=True)
+    rates = models.JSONField(default=dict)
+
+    class Meta:
+        db_table = 'exchange_rate_snapshots'
+        ordering = ['fetched_at']
+
+    def __str__(self):
+        return f"rates @ {self.fetched_at.isoformat()}"
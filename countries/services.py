@@ -1,10 +1,15 @@
 import os
 import io
 import random
-from datetime import datetime, timezone
+from datetime import datetime, timezone, timedelta
 import requests
 from django.conf import settings
+from django.db.models import Avg, Count, FloatField, Max, Min
+from django.db.models.fields.json import KeyTextTransform
+from django.db.models.functions import Cast, TruncDate, TruncDay, TruncHour, TruncMonth, TruncWeek
+from django.utils import timezone as dj_timezone
 from PIL import Image, ImageDraw, ImageFont
+from .models import ExchangeRateSnapshot
 
 COUNTRIES_API = os.getenv('EXTERNAL_COUNTRIES_API', settings.EXTERNAL_COUNTRIES_API)
 EXCHANGE_API = os.getenv('EXTERNAL_EXCHANGE_API', settings.EXTERNAL_EXCHANGE_API)
@@ -29,6 +34,85 @@ def fetch_exchange_rates():
     except Exception as e:
         raise RuntimeError(f"Could not fetch data from Exchange API: {e}")
 
+def record_rate_snapshot(rates, timestamp):
+    """
+    Append the full rates payload from one refresh to the history store.
+    """
+    return ExchangeRateSnapshot.objects.create(fetched_at=timestamp, rates=rates)
+
+def compact_rate_history(now=None, retention_days=None, compact_after_days=None):
+    """
+    Apply retention and compaction to the rates history.
+    Snapshots older than retention_days are dropped (0 = keep forever);
+    snapshots older than compact_after_days are thinned to the last one per day.
+    Returns (expired, compacted) row counts.
+    """
+    now = now or dj_timezone.now()
+    if retention_days is None:
+        retention_days = settings.RATE_HISTORY_RETENTION_DAYS
+    if compact_after_days is None:
+        compact_after_days = settings.RATE_HISTORY_COMPACT_AFTER_DAYS
+
+    expired = 0
+    if retention_days > 0:
+        expired, _ = ExchangeRateSnapshot.objects.filter(
+            fetched_at__lt=now - timedelta(days=retention_days)
+        ).delete()
+
+    old = ExchangeRateSnapshot.objects.filter(fetched_at__lt=now - timedelta(days=compact_after_days))
+    # last snapshot per day, left as a subquery so the ids never leave the database
+    keep_ids = (
+        old.annotate(day=TruncDate('fetched_at'))
+        .order_by()
+        .values('day')
+        .annotate(keep=Max('id'))
+        .values('keep')
+    )
+    compacted, _ = old.exclude(id__in=keep_ids).delete()
+    return expired, compacted
+
+# step -> truncation used to bucket snapshots; 'raw' returns every snapshot
+HISTORY_STEPS = {
+    'raw': None,
+    'hour': TruncHour,
+    'day': TruncDay,
+    'week': TruncWeek,
+    'month': TruncMonth,
+}
+
+def rate_history(code, start=None, end=None, step='raw'):
+    """
+    Time series of one currency's rate between start and end (inclusive).
+    Only the requested currency is extracted, and downsampling is done
+    by the database, so the full history is never loaded into memory.
+    """
+    qs = ExchangeRateSnapshot.objects.filter(rates__has_key=code)
+    if start:
+        qs = qs.filter(fetched_at__gte=start)
+    if end:
+        qs = qs.filter(fetched_at__lte=end)
+    rate = Cast(KeyTextTransform(code, 'rates'), FloatField())
+
+    trunc = HISTORY_STEPS[step]
+    if trunc is None:
+        rows = qs.order_by('fetched_at').annotate(rate=rate).values_list('fetched_at', 'rate')
+        return [{'timestamp': ts, 'rate': r} for ts, r in rows.iterator()]
+
+    rows = (
+        qs.annotate(bucket=trunc('fetched_at'))
+        .order_by()
+        .values('bucket')
+        .annotate(rate=Avg(rate), min=Min(rate), max=Max(rate), samples=Count('id'))
+        .order_by('bucket')
+    )
+    return [{
+        'timestamp': r['bucket'],
+        'rate': r['rate'],
+        'min': r['min'],
+        'max': r['max'],
+        'samples': r['samples'],
+    } for r in rows.iterator()]
+
 def compute_estimated_gdp(population, exchange_rate):
     """
     population × random(1000–2000) ÷ exchange_rate
@@ -1,3 +1,105 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
 from django.test import TestCase
 
 # Create your tests here.
+from .models import ExchangeRateSnapshot
+from . import services
+
+NOW = datetime(2026, 10, 18, 12, 0, tzinfo=dt_timezone.utc)
+
+
+def snapshot(when, **rates):
+    return ExchangeRateSnapshot.objects.create(fetched_at=when, rates=rates or {'NGN': 1500.0})
+
+
+class CompactRateHistoryTests(TestCase):
+
+    def test_expires_old_and_keeps_last_snapshot_per_day(self):
+        # 40 and 41 days old: past retention
+        snapshot(NOW - timedelta(days=40))
+        snapshot(NOW - timedelta(days=41))
+        # 10 days old, three on the same day: compacted to the latest
+        old_day = NOW - timedelta(days=10)
+        snapshot(old_day.replace(hour=1))
+        snapshot(old_day.replace(hour=2))
+        kept = snapshot(old_day.replace(hour=3))
+        # recent: untouched
+        recent = [snapshot(NOW - timedelta(hours=h)) for h in (1, 2)]
+
+        expired, compacted = services.compact_rate_history(now=NOW, retention_days=30, compact_after_days=5)
+
+        self.assertEqual(expired, 2)
+        self.assertEqual(compacted, 2)
+        remaining = set(ExchangeRateSnapshot.objects.values_list('id', flat=True))
+        self.assertEqual(remaining, {kept.id} | {s.id for s in recent})
+
+    def test_zero_retention_keeps_everything(self):
+        snapshot(NOW - timedelta(days=1000))
+        snapshot(NOW - timedelta(days=1))
+
+        expired, compacted = services.compact_rate_history(now=NOW, retention_days=0, compact_after_days=30)
+
+        self.assertEqual((expired, compacted), (0, 0))
+        self.assertEqual(ExchangeRateSnapshot.objects.count(), 2)
+
+
+class RateHistoryTests(TestCase):
+
+    def setUp(self):
+        # two days of snapshots every 6 hours; NGN rises by 1 per snapshot
+        self.start = datetime(2026, 10, 17, 0, 0, tzinfo=dt_timezone.utc)
+        for i in range(8):
+            snapshot(self.start + timedelta(hours=6 * i), NGN=1500.0 + i, EUR=0.9)
+        snapshot(self.start + timedelta(hours=3), EUR=0.9)
+
+    def test_raw_returns_each_snapshot_with_the_currency(self):
+        points = services.rate_history('NGN', step='raw')
+
+        self.assertEqual(len(points), 8)
+        self.assertEqual(points[0], {'timestamp': self.start, 'rate': 1500.0})
+        self.assertEqual(points[-1]['rate'], 1507.0)
+
+    def test_day_step_aggregates_in_buckets(self):
+        points = services.rate_history('NGN', step='day')
+
+        self.assertEqual(len(points), 2)
+        self.assertEqual(points[0]['timestamp'], self.start)
+        self.assertEqual(points[0]['rate'], 1501.5)
+        self.assertEqual(points[0]['min'], 1500.0)
+        self.assertEqual(points[0]['max'], 1503.0)
+        self.assertEqual(points[0]['samples'], 4)
+        self.assertEqual(points[1]['samples'], 4)
+
+
+class RateHistoryViewTests(TestCase):
+
+    def setUp(self):
+        for h in (1, 6, 23):
+            snapshot(datetime(2026, 10, 18, h, 0, tzinfo=dt_timezone.utc), NGN=1500.0 + h)
+        snapshot(datetime(2026, 10, 19, 1, 0, tzinfo=dt_timezone.utc), NGN=1600.0)
+
+    def test_date_only_bounds_cover_whole_days(self):
+        resp = self.client.get('/rates/ngn/history', {'from': '2026-10-18', 'to': '2026-10-18', 'step': 'day'})
+
+        self.assertEqual(resp.status_code, 200)
+        data = resp.json()
+        self.assertEqual(data['currency_code'], 'NGN')
+        self.assertEqual(len(data['points']), 1)
+        self.assertEqual(data['points'][0]['samples'], 3)
+
+    def test_malformed_bound_is_rejected(self):
+        resp = self.client.get('/rates/NGN/history', {'from': 'yesterday'})
+
+        self.assertEqual(resp.status_code, 400)
+        self.assertIn('from', resp.json()['details'])
+
+    def test_bad_step_is_rejected(self):
+        resp = self.client.get('/rates/NGN/history', {'step': 'minute'})
+
+        self.assertEqual(resp.status_code, 400)
+        self.assertIn('step', resp.json()['details'])
+
+    def test_unknown_currency_is_not_found(self):
+        resp = self.client.get('/rates/XXX/history')
+
+        self.assertEqual(resp.status_code, 404)
@@ -1,5 +1,5 @@
 from django.urls import path
-from .views import RefreshCountriesView, CountriesListView, CountryDetailView, StatusView, CountryImageView
+from .views import RefreshCountriesView, CountriesListView, CountryDetailView, StatusView, CountryImageView, RateHistoryView
 
 urlpatterns = [
     path('countries/refresh', RefreshCountriesView.as_view(), name='countries-refresh'),
@@ -7,4 +7,5 @@ urlpatterns = [
     path('countries/image', CountryImageView.as_view(), name='countries-image'),
     path('countries/<str:name>', CountryDetailView.as_view(), name='country-detail'),
     path('status', StatusView.as_view(), name='status'),
+    path('rates/<str:code>/history', RateHistoryView.as_view(), name='rate-history'),
 ]
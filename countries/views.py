@@ -4,13 +4,18 @@ from rest_framework import status
 from django.db import transaction
 from django.utils import timezone
 from django.shortcuts import get_object_or_404
-from .models import Country
+from .models import Country, ExchangeRateSnapshot
 from .serializers import CountrySerializer
 from . import services
 from django.http import FileResponse, JsonResponse
 import os
+import logging
 from django.conf import settings
 from django.db.models import Q
+from django.utils.dateparse import parse_date, parse_datetime
+from datetime import datetime, time
+
+logger = logging.getLogger(__name__)
 
 class RefreshCountriesView(APIView):
     """
@@ -128,12 +133,20 @@ class RefreshCountriesView(APIView):
                             flag_url=flag_url,
                             last_refreshed_at=now
                         )
+                # append the full rates payload to the history store
+                services.record_rate_snapshot(exchange_rates, now)
                 # save global last_refreshed somewhere: easiest is store in a single-row DB or settings.
                 # For simplicity we'll use a small cache file to store last refresh time.
                 # But we'll also rely on the countries last_refreshed_at.
         except Exception as e:
             return Response({"error": "Internal server error"}, status=500)
 
+        # history retention/compaction runs after the commit so it can never roll back a refresh
+        try:
+            services.compact_rate_history(now=now)
+        except Exception:
+            logger.exception("Exchange-rate history compaction failed")
+
         # Generate summary image:
         # Get total and top 5 by estimated_gdp (descending), handle nulls such that None are treated as lowest
         total = Country.objects.count()
@@ -238,3 +251,58 @@ class CountryImageView(APIView):
         if not os.path.exists(path):
             return Response({"error": "Summary image not found"}, status=404)
         return FileResponse(open(path, 'rb'), content_type='image/png')
+
+
+def _parse_bound(value, end_of_day=False):
+    """
+    Accepts an ISO datetime or a plain date; plain dates cover the whole day.
+    Returns None for a missing value and raises ValueError for a malformed one.
+    """
+    if not value:
+        return None
+    # parse_datetime also accepts date-only strings (as midnight), so try dates first
+    d = parse_date(value)
+    if d is not None:
+        dt = datetime.combine(d, time.max if end_of_day else time.min)
+    else:
+        dt = parse_datetime(value)
+        if dt is None:
+            raise ValueError(value)
+    if timezone.is_naive(dt):
+        dt = timezone.make_aware(dt)
+    return dt
+
+
+class RateHistoryView(APIView):
+    """
+    GET /rates/<code>/history -> supports ?from= & ?to= & ?step=raw|hour|day|week|month
+    """
+
+    def get(self, request, code):
+        code = code.upper()
+        step = request.query_params.get('step') or 'raw'
+        errors = {}
+        try:
+            start = _parse_bound(request.query_params.get('from'))
+        except ValueError:
+            errors['from'] = 'must be an ISO date or datetime'
+        try:
+            end = _parse_bound(request.query_params.get('to'), end_of_day=True)
+        except ValueError:
+            errors['to'] = 'must be an ISO date or datetime'
+        if step not in services.HISTORY_STEPS:
+            errors['step'] = f"must be one of {', '.join(services.HISTORY_STEPS)}"
+        if errors:
+            return Response({"error": "Validation failed", "details": errors}, status=400)
+
+        if not ExchangeRateSnapshot.objects.filter(rates__has_key=code).exists():
+            return Response({"error": "Currency not found"}, status=404)
+
+        points = services.rate_history(code, start=start, end=end, step=step)
+        return Response({
+            "currency_code": code,
+            "step": step,
+            "from": start,
+            "to": end,
+            "points": points
+        }, status=200)
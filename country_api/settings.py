@@ -68,7 +68,7 @@ WSGI_APPLICATION = 'country_api.wsgi.application'
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'NAME': os.getenv('SQLITE_PATH', BASE_DIR / 'db.sqlite3'),
     }
 }
 
@@ -100,4 +100,8 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 EXTERNAL_COUNTRIES_API = os.getenv('EXTERNAL_COUNTRIES_API', 'https://restcountries.com/v2/all?fields=name,capital,region,population,flag,currencies')
 EXTERNAL_EXCHANGE_API = os.getenv('EXTERNAL_EXCHANGE_API', 'https://open.er-api.com/v6/latest/USD')
-SUMMARY_IMAGE_PATH = os.getenv('SUMMARY_IMAGE_PATH', os.path.join(BASE_DIR, 'cache', 'summary.png'))
\ No newline at end of file
+SUMMARY_IMAGE_PATH = os.getenv('SUMMARY_IMAGE_PATH', os.path.join(BASE_DIR, 'cache', 'summary.png'))
+# Exchange-rate history: drop snapshots older than RETENTION days (0 = keep forever)
+# and keep only the last snapshot per day once they are older than COMPACT_AFTER days.
+RATE_HISTORY_RETENTION_DAYS = int(os.getenv('RATE_HISTORY_RETENTION_DAYS', '730'))
+RATE_HISTORY_COMPACT_AFTER_DAYS = int(os.getenv('RATE_HISTORY_COMPACT_AFTER_DAYS', '30'))
@@ -0,0 +1,437 @@
+"""
+End-to-end load test for the Country Currency & Exchange API.
+
+Starts the app the way the Procfile does (`gunicorn country_api.wsgi`) against
+a throwaway SQLite DB and a local stub for both upstream APIs, then drives a
+mix of /countries filters and sorts, detail lookups, /status, /countries/image
+and periodic POST /countries/refresh. Reports throughput and p50/p95/p99
+latency per endpoint.
+
+    python loadtest.py --duration 30 --concurrency 8
+    python loadtest.py --save-baseline loadtest_baseline.json
+    python loadtest.py --baseline loadtest_baseline.json --threshold 20
+
+With --baseline the run exits non-zero if any endpoint's p95 latency grows, or
+its throughput drops, by more than --threshold percent. Latency is not compared
+for endpoints with fewer than --min-samples requests, and a baseline recorded
+with a different workload (concurrency, workers, mix, refresh interval or
+country count) is refused.
+"""
+import argparse
+import json
+import math
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+REGIONS = ['Africa', 'Americas', 'Asia', 'Europe', 'Oceania']
+ENDPOINTS = ['list', 'detail', 'status', 'image']
+DEFAULT_MIX = 'list=45,detail=30,status=15,image=10'
+
+
+# ----- upstream stub -----
+
+def build_stub_data(n_countries, seed):
+    """
+    Deterministic fake payloads shaped like restcountries v2 and open.er-api.
+    """
+    rnd = random.Random(seed)
+    currencies = [f"C{i:02d}" for i in range(40)]
+    rates = {code: round(rnd.uniform(0.1, 2000), 4) for code in currencies}
+    countries = []
+    for i in range(n_countries):
+        # a few countries without currencies or with unknown ones, as upstream has
+        if i % 25 == 0:
+            country_currencies = []
+        elif i % 25 == 1:
+            country_currencies = [{'code': 'ZZZ'}]
+        else:
+            country_currencies = [{'code': rnd.choice(currencies)}]
+        countries.append({
+            'name': f"Country {i:03d}",
+            'capital': f"Capital {i:03d}",
+            'region': rnd.choice(REGIONS),
+            'population': rnd.randint(10_000, 200_000_000),
+            'flag': f"https://flags.example.com/{i:03d}.svg",
+            'currencies': country_currencies,
+        })
+    return countries, rates
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    countries_body = b'[]'
+    rates_body = b'{}'
+
+    def do_GET(self):
+        if self.path.startswith('/countries'):
+            body = self.countries_body
+        elif self.path.startswith('/rates'):
+            body = self.rates_body
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub(countries, rates):
+    StubHandler.countries_body = json.dumps(countries).encode()
+    StubHandler.rates_body = json.dumps({'result': 'success', 'base_code': 'USD', 'rates': rates}).encode()
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+# ----- app under test -----
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_app(workdir, stub_url, workers):
+    """
+    Migrate a fresh SQLite DB and start gunicorn against it.
+    Returns (process, base_url).
+    """
+    env = dict(os.environ)
+    env.update({
+        'DJANGO_SETTINGS_MODULE': 'country_api.settings',
+        'SQLITE_PATH': os.path.join(workdir, 'db.sqlite3'),
+        'SUMMARY_IMAGE_PATH': os.path.join(workdir, 'cache', 'summary.png'),
+        'EXTERNAL_COUNTRIES_API': f"{stub_url}/countries",
+        'EXTERNAL_EXCHANGE_API': f"{stub_url}/rates",
+        'ALLOWED_HOSTS': '127.0.0.1,localhost',
+        'DEBUG': 'False',
+    })
+    subprocess.run([sys.executable, 'manage.py', 'migrate', '--noinput', '-v', '0'],
+                   cwd=BASE_DIR, env=env, check=True)
+
+    port = free_port()
+    proc = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', 'country_api.wsgi',
+         '--bind', f"127.0.0.1:{port}", '--workers', str(workers), '--log-level', 'warning'],
+        cwd=BASE_DIR, env=env,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"gunicorn exited with code {proc.returncode}")
+        try:
+            urllib.request.urlopen(f"{base_url}/status", timeout=2).read()
+            return proc, base_url
+        except (urllib.error.URLError, ConnectionError):
+            time.sleep(0.2)
+    proc.terminate()
+    raise RuntimeError("gunicorn did not become ready within 30s")
+
+
+# ----- workload -----
+
+def parse_mix(spec):
+    weights = {}
+    for part in spec.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in ENDPOINTS:
+            raise argparse.ArgumentTypeError(f"unknown endpoint '{name}', expected one of {', '.join(ENDPOINTS)}")
+        try:
+            weights[name] = float(weight)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"invalid weight for '{name}': {weight!r}")
+    if not any(weights.values()):
+        raise argparse.ArgumentTypeError("mix needs at least one positive weight")
+    return weights
+
+
+def build_request(endpoint, rnd, countries, currencies):
+    """
+    Returns (method, path) for one request of the given endpoint kind.
+    """
+    if endpoint == 'list':
+        params = {}
+        if rnd.random() < 0.4:
+            params['region'] = rnd.choice(REGIONS).lower()
+        if rnd.random() < 0.3:
+            params['currency'] = rnd.choice(currencies)
+        sort = rnd.choice([None, 'gdp_desc', 'gdp_asc'])
+        if sort:
+            params['sort'] = sort
+        query = urllib.parse.urlencode(params)
+        return 'GET', '/countries' + (f"?{query}" if query else '')
+    if endpoint == 'detail':
+        name = rnd.choice(countries)['name']
+        # mix in case differences since lookups are case-insensitive
+        if rnd.random() < 0.3:
+            name = name.upper()
+        return 'GET', '/countries/' + urllib.parse.quote(name)
+    if endpoint == 'status':
+        return 'GET', '/status'
+    if endpoint == 'image':
+        return 'GET', '/countries/image'
+    if endpoint == 'refresh':
+        return 'POST', '/countries/refresh'
+    raise ValueError(endpoint)
+
+
+class Recorder:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = {}
+        self.errors = {}
+
+    def add(self, endpoint, seconds, ok):
+        with self.lock:
+            self.latencies.setdefault(endpoint, []).append(seconds)
+            if not ok:
+                self.errors[endpoint] = self.errors.get(endpoint, 0) + 1
+
+
+def timed_request(base_url, method, path, timeout):
+    req = urllib.request.Request(base_url + path, method=method, data=b'' if method == 'POST' else None)
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            resp.read()
+            ok = 200 <= resp.status < 300
+    except urllib.error.HTTPError as e:
+        e.read()
+        ok = False
+    except (urllib.error.URLError, ConnectionError, TimeoutError):
+        ok = False
+    return time.perf_counter() - start, ok
+
+
+def worker(base_url, weights, countries, currencies, stop_at, recorder, seed, timeout):
+    rnd = random.Random(seed)
+    names = list(weights)
+    values = list(weights.values())
+    while time.time() < stop_at:
+        endpoint = rnd.choices(names, weights=values)[0]
+        method, path = build_request(endpoint, rnd, countries, currencies)
+        elapsed, ok = timed_request(base_url, method, path, timeout)
+        recorder.add(endpoint, elapsed, ok)
+
+
+def refresher(base_url, interval, stop_at, recorder, timeout):
+    next_at = time.time() + interval
+    while True:
+        time.sleep(max(0, next_at - time.time()))
+        if time.time() >= stop_at:
+            return
+        elapsed, ok = timed_request(base_url, 'POST', '/countries/refresh', timeout)
+        recorder.add('refresh', elapsed, ok)
+        next_at += interval
+
+
+def percentile(sorted_values, pct):
+    # nearest-rank
+    if not sorted_values:
+        return None
+    k = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[k]
+
+
+def summarize(recorder, duration):
+    results = {}
+    for endpoint, values in sorted(recorder.latencies.items()):
+        values = sorted(values)
+        results[endpoint] = {
+            'requests': len(values),
+            'errors': recorder.errors.get(endpoint, 0),
+            'rps': len(values) / duration,
+            'p50_ms': percentile(values, 50) * 1000,
+            'p95_ms': percentile(values, 95) * 1000,
+            'p99_ms': percentile(values, 99) * 1000,
+        }
+    return results
+
+
+def print_report(results, duration):
+    total = sum(r['requests'] for r in results.values())
+    print(f"\n{total} requests in {duration:.1f}s ({total / duration:.1f} req/s)\n")
+    print(f"{'endpoint':<10}{'requests':>10}{'errors':>8}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    for endpoint, r in results.items():
+        print(f"{endpoint:<10}{r['requests']:>10}{r['errors']:>8}{r['rps']:>9.1f}"
+              f"{r['p50_ms']:>9.1f}{r['p95_ms']:>9.1f}{r['p99_ms']:>9.1f}")
+
+
+# config keys that define the workload; a baseline is only comparable when these match
+WORKLOAD_KEYS = ['concurrency', 'workers', 'mix', 'refresh_interval', 'countries']
+
+
+def config_mismatches(current, baseline_config):
+    """
+    Returns a list of workload settings that differ from the baseline's.
+    """
+    return [f"{key}: {current.get(key)!r} vs baseline {baseline_config.get(key)!r}"
+            for key in WORKLOAD_KEYS if current.get(key) != baseline_config.get(key)]
+
+
+def compare_to_baseline(results, baseline, threshold, min_samples):
+    """
+    Returns (regressions, skipped) as human-readable lines; regressions is empty
+    when within threshold. Latency is only compared for endpoints with at least
+    min_samples requests in both runs, otherwise p95 is just the slowest request.
+    """
+    regressions = []
+    skipped = []
+    limit = 1 + threshold / 100
+    for endpoint, base in baseline.get('endpoints', {}).items():
+        current = results.get(endpoint)
+        if current is None:
+            regressions.append(f"{endpoint}: no requests in this run")
+            continue
+        samples = min(current['requests'], base['requests'])
+        if samples < min_samples:
+            skipped.append(f"{endpoint}: insufficient samples for latency ({samples} < {min_samples})")
+        elif base['p95_ms'] and current['p95_ms'] > base['p95_ms'] * limit:
+            regressions.append(f"{endpoint}: p95 {current['p95_ms']:.1f}ms vs baseline {base['p95_ms']:.1f}ms")
+        # refresh runs on a timer, so its throughput says nothing about the app
+        if endpoint != 'refresh' and base['rps'] and current['rps'] < base['rps'] / limit:
+            regressions.append(f"{endpoint}: {current['rps']:.1f} req/s vs baseline {base['rps']:.1f} req/s")
+        if current['errors'] > base['errors']:
+            regressions.append(f"{endpoint}: {current['errors']} errors vs baseline {base['errors']}")
+    return regressions, skipped
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Load test the API behind gunicorn with stubbed upstreams')
+    parser.add_argument('--duration', type=float, default=30, help='Seconds to run the workload')
+    parser.add_argument('--warmup', type=float, default=2, help='Seconds of unrecorded traffic before measuring')
+    parser.add_argument('--concurrency', type=int, default=8, help='Number of client threads')
+    parser.add_argument('--workers', type=int, default=2, help='gunicorn worker processes')
+    parser.add_argument('--mix', type=parse_mix, default=parse_mix(DEFAULT_MIX),
+                        help=f"Weighted read mix, e.g. '{DEFAULT_MIX}'")
+    parser.add_argument('--refresh-interval', type=float, default=10,
+                        help='Seconds between POST /countries/refresh calls (0 disables)')
+    parser.add_argument('--countries', type=int, default=250, help='Countries served by the upstream stub')
+    parser.add_argument('--timeout', type=float, default=30, help='Per-request timeout in seconds')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--json', dest='json_out', help='Write the results to this file')
+    parser.add_argument('--save-baseline', help='Save this run as a baseline to this file')
+    parser.add_argument('--baseline', help='Compare against this baseline and fail on regressions')
+    parser.add_argument('--threshold', type=float, default=20,
+                        help='Allowed regression vs baseline, in percent')
+    parser.add_argument('--min-samples', type=int, default=20,
+                        help='Skip the latency check for endpoints with fewer requests than this')
+    args = parser.parse_args(argv)
+    config = {
+        'duration': args.duration,
+        'concurrency': args.concurrency,
+        'workers': args.workers,
+        'mix': args.mix,
+        'refresh_interval': args.refresh_interval,
+        'countries': args.countries,
+    }
+
+    # check the baseline up front so a mismatched workload fails before the run, not after
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        mismatches = config_mismatches(config, baseline.get('config', {}))
+        if mismatches:
+            print(f"Refusing to compare against {args.baseline}: the workload differs", file=sys.stderr)
+            for line in mismatches:
+                print(f"  - {line}", file=sys.stderr)
+            return 2
+
+    countries, rates = build_stub_data(args.countries, args.seed)
+    currencies = sorted(rates)
+    stub = start_stub(countries, rates)
+    stub_url = f"http://127.0.0.1:{stub.server_address[1]}"
+    workdir = tempfile.mkdtemp(prefix='loadtest-')
+    proc = None
+    try:
+        proc, base_url = start_app(workdir, stub_url, args.workers)
+        elapsed, ok = timed_request(base_url, 'POST', '/countries/refresh', args.timeout)
+        if not ok:
+            print("Initial refresh failed", file=sys.stderr)
+            return 2
+        print(f"App ready at {base_url}, seeded {args.countries} countries in {elapsed * 1000:.0f}ms")
+
+        if args.warmup > 0:
+            warmup = Recorder()
+            stop_at = time.time() + args.warmup
+            threads = [threading.Thread(target=worker, args=(base_url, args.mix, countries, currencies,
+                                                            stop_at, warmup, args.seed + i, args.timeout))
+                       for i in range(args.concurrency)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+
+        recorder = Recorder()
+        started = time.time()
+        stop_at = started + args.duration
+        threads = [threading.Thread(target=worker, args=(base_url, args.mix, countries, currencies,
+                                                        stop_at, recorder, args.seed + 1000 + i, args.timeout))
+                   for i in range(args.concurrency)]
+        if args.refresh_interval > 0:
+            threads.append(threading.Thread(target=refresher, args=(base_url, args.refresh_interval,
+                                                                    stop_at, recorder, args.timeout)))
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        duration = time.time() - started
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait(timeout=10)
+        stub.shutdown()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    results = summarize(recorder, duration)
+    print_report(results, duration)
+
+    report = {
+        'config': config,
+        'endpoints': results,
+    }
+    if args.json_out:
+        with open(args.json_out, 'w') as f:
+            json.dump(report, f, indent=2)
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nBaseline saved to {args.save_baseline}")
+
+    if baseline is not None:
+        regressions, skipped = compare_to_baseline(results, baseline, args.threshold, args.min_samples)
+        if skipped:
+            print("\nSkipped:")
+            for line in skipped:
+                print(f"  - {line}")
+        if regressions:
+            print(f"\nRegressions beyond {args.threshold:g}%:")
+            for line in regressions:
+                print(f"  - {line}")
+            return 1
+        print(f"\nWithin {args.threshold:g}% of baseline {args.baseline}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())